@@ -0,0 +1,25 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Compiled GravitationalBit kernels (optional)
+Used by booster.py when Numba is not installed.
+
+Build in place with:  cythonize -i _bitcore.pyx
+"""
+
+from libc.math cimport fmod
+
+cdef float TWO_PI = 6.283185307179586
+
+def evolve(const unsigned char[::1] occupied, float[::1] phase,
+           const float[::1] energy, double dt, double field):
+    """Phase propagation kernel (same contract as booster._evolve)"""
+    cdef Py_ssize_t i
+    cdef Py_ssize_t n = phase.shape[0]
+    cdef float step = <float>(dt * field)
+    cdef float p
+    with nogil:
+        for i in range(n):
+            p = fmod(phase[i] + energy[i] * step * occupied[i], TWO_PI)
+            if p < 0:
+                p += TWO_PI  # Python/NumPy modulo sign convention
+            phase[i] = p
@@ -7,33 +7,141 @@ Works with ANY LLM (Groq, OpenAI, Anthropic, Ollama, etc.)
 Uses quantum-inspired compression for maximum efficiency.
 """
 
+import os
 import sys
 import json
 import hashlib
-from dataclasses import dataclass
-from typing import List, Dict, Any
-from random import random
+import pickle
+import re
+import tempfile
+from array import array
+from functools import lru_cache, partial
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import List, Dict, Any, Optional
 from math import pi
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:  # Optional: JIT-compiled kernels
+    HAS_NUMBA = False
+
+try:
+    from blake3 import blake3
+    HAS_BLAKE3 = True
+except ImportError:  # Optional: SIMD hashing, falls back to blake2b
+    HAS_BLAKE3 = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:  # Optional: faster JSON, falls back to stdlib json
+    HAS_ORJSON = False
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize to UTF-8 JSON bytes (orjson when available)"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode()
+
+_NON_ASCII_RE = re.compile(r'[^\x00-\x7f]')
+
+def _escape_non_ascii(match) -> str:
+    """JSON \\u escape of one character (surrogate pair beyond the BMP)"""
+    code = ord(match.group())
+    if code > 0xFFFF:
+        code -= 0x10000
+        return '\\u%04x\\u%04x' % (0xD800 | (code >> 10), 0xDC00 | (code & 0x3FF))
+    return '\\u%04x' % code
+
+def _json_dumps_ascii(obj: Any) -> bytes:
+    """
+    Serialize to ASCII-only JSON bytes, for stdout.
+    Non-ASCII characters are \\u-escaped like json.dumps, so stdout
+    decodes the same under any locale encoding.
+    """
+    if not HAS_ORJSON:
+        return json.dumps(obj).encode('ascii')
+    data = orjson.dumps(obj)
+    if data.isascii():
+        return data
+    # Non-ASCII only occurs inside strings: escape it in place
+    return _NON_ASCII_RE.sub(_escape_non_ascii, data.decode()).encode('ascii')
+
+def _json_loads(data) -> Any:
+    """Parse JSON from str or bytes (orjson when available)"""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _digest(data: bytes) -> bytes:
+    """32-byte content digest (BLAKE3, or BLAKE2b when unavailable)"""
+    if HAS_BLAKE3:
+        return blake3(data).digest()
+    return hashlib.blake2b(data, digest_size=32).digest()
 
 # ============================================================================
 # GRAVITATIONAL BIT CORE (n_max=15 → 1240 états)
 # ============================================================================
 
-@dataclass
-class OrbitalState:
-    """Quantum orbital state (atom-inspired)"""
-    n: int          # Principal quantum number
-    l: int          # Angular momentum
-    m: int          # Magnetic projection
-    occupied: bool  # State occupied (1) or empty (0)
-    energy: float   # Quantized energy
-    phase: float    # Quantum phase
+TWO_PI = np.float32(2 * pi)
+
+if HAS_NUMBA:
+    @njit(cache=True, fastmath=True)
+    def _evolve(occupied, phase, energy, dt, field):
+        """Phase propagation kernel (compiled once, reused by every bit)"""
+        step = np.float32(dt * field)
+        for i in range(phase.shape[0]):
+            phase[i] = (phase[i] + energy[i] * step * occupied[i]) % TWO_PI
+else:
+    try:
+        # Optional Cython build of the same kernel (see _bitcore.pyx)
+        from _bitcore import evolve as _evolve
+    except ImportError:
+        def _evolve(occupied, phase, energy, dt, field):
+            """Phase propagation kernel (NumPy fallback)"""
+            # Multiplying by the occupancy mask keeps empty states at phase 0
+            step = np.float32(dt * field)
+            np.mod(phase + energy * step * occupied, TWO_PI, out=phase)
+
+@lru_cache(maxsize=4)
+def _orbital_template(n_max: int):
+    """Read-only (n, l, m, energy) orbital tables for n_max (built once)"""
+    ns, ls, ms = [], [], []
+    for n in range(1, n_max + 1):
+        for l in range(n):
+            for m in range(-l, l + 1):
+                ns.append(n)
+                ls.append(l)
+                ms.append(m)
+    n_arr = np.asarray(ns, dtype=np.int16)  # Principal quantum number
+    l_arr = np.asarray(ls, dtype=np.int16)  # Angular momentum
+    m_arr = np.asarray(ms, dtype=np.int16)  # Magnetic projection
+    energy = (-13.6 / (n_arr.astype(np.float32) ** 2)).astype(np.float32)  # Hydrogen-like
+    for arr in (n_arr, l_arr, m_arr, energy):
+        arr.flags.writeable = False  # Shared between all bits
+    return n_arr, l_arr, m_arr, energy
+
+@lru_cache(maxsize=4)
+def _state_mask(n_states: int) -> int:
+    """Bit mask keeping the low n_states bits (built once per level)"""
+    return (1 << n_states) - 1
 
 class GravitationalBit:
     """
     Quantum-inspired bit with massive compression.
     Uses atomic orbital structure (n_max=15 → 1240 states).
+
+    States are stored as parallel arrays (n, l, m, occupied, energy,
+    phase) instead of one Python object per orbital. The quantum numbers
+    and energies are shared read-only tables; each bit only owns its
+    occupied/phase arrays (float32 phases, evolved in place).
     """
     
     def __init__(self, compression_level: int = 15):
@@ -44,43 +152,35 @@ class GravitationalBit:
         """
         self.n_max = compression_level
         self.nucleus_field = 1.0
-        self.states = []
         self.operation_count = 0
         
-        # Generate orbital states
-        for n in range(1, self.n_max + 1):
-            for l in range(n):
-                for m in range(-l, l + 1):
-                    energy = -13.6 / (n * n)  # Hydrogen-like
-                    self.states.append(OrbitalState(
-                        n=n, l=l, m=m,
-                        occupied=False,
-                        energy=energy,
-                        phase=0.0
-                    ))
+        # Orbital tables (n, l, m, energy), shared by all bits of a level
+        self.n, self.l, self.m, self.energy = _orbital_template(compression_level)
+        self.n_states = len(self.n)
+        self._mask = _state_mask(self.n_states)
+        
+        self.occupied = np.zeros(self.n_states, dtype=np.uint8)  # 1 = occupied
+        self.phase = np.zeros(self.n_states, dtype=np.float32)   # Quantum phase
     
     def encode(self, value: int):
         """Encode integer into orbital states"""
-        for i, state in enumerate(self.states):
-            state.occupied = (value >> i) & 1
-            state.phase = random() * 2 * pi if state.occupied else 0.0
+        value &= self._mask  # Keep the low n_states bits
+        raw = value.to_bytes((self.n_states + 7) // 8, 'little')
+        self.occupied = np.unpackbits(np.frombuffer(raw, dtype=np.uint8),
+                                      bitorder='little')[:self.n_states]
+        self.phase = (np.random.random(self.n_states).astype(np.float32)
+                      * TWO_PI * self.occupied)
         self.operation_count += 1
     
     def decode(self) -> int:
         """Decode orbital states to integer"""
-        value = 0
-        for i, state in enumerate(self.states):
-            if state.occupied:
-                value |= (1 << i)
+        raw = np.packbits(self.occupied, bitorder='little').tobytes()
         self.operation_count += 1
-        return value
+        return int.from_bytes(raw, 'little')
     
     def propagate(self, dt: float = 0.01):
         """Quantum evolution (phase propagation)"""
-        for state in self.states:
-            if state.occupied:
-                state.phase += state.energy * dt * self.nucleus_field
-                state.phase %= (2 * pi)
+        _evolve(self.occupied, self.phase, self.energy, dt, self.nucleus_field)
         self.operation_count += 1
     
     def verify_integrity(self, original_value: int) -> bool:
@@ -92,41 +192,84 @@ class GravitationalBit:
 # GRAVITATIONAL MEMORY
 # ============================================================================
 
+_TOKEN_RE = re.compile(r"\w{4,}")  # Keywords: 4+ word characters
+
+CACHE_DIR_ENV = 'ALLPATH_CACHE_DIR'  # Opt-in disk cache directory for init()
+DEFAULT_CACHE_MAX_BYTES = 256 * 1024 * 1024  # Disk cache size cap (LRU eviction)
+_CACHE_VERSION = 2  # Bump when the cached memory layout changes
+
 class GravitationalMemory:
     """
     Compressed storage using Gravitational Bits.
     Achieves 1240× compression (n_max=15) with 100% integrity.
     """
     
-    def __init__(self, compression_level: int = 15):
+    def __init__(self, compression_level: int = 15,
+                 enable_gravitational_sim: bool = True,
+                 cache_dir: Optional[str] = None,
+                 cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        """
+        Args:
+            compression_level: Orbital level of each bit (default=15)
+            enable_gravitational_sim: Encode/propagate/verify a bit per chunk
+                                      (False skips it for faster bulk loads)
+            cache_dir: Directory persisting loaded documents across runs
+                       (default=None, no disk cache)
+            cache_max_bytes: Disk cache size cap; least recently used
+                             entries are evicted beyond it (default=256 MB)
+        """
         self.compression_level = compression_level
-        self.storage = {}  # chunk_id -> {bit, text, hash}
-        self.index = {}    # keyword -> [chunk_ids]
+        self.n_states = compression_level * (compression_level + 1) * (2 * compression_level + 1) // 6
+        self._simulate = enable_gravitational_sim
+        self.cache_dir = os.path.expanduser(cache_dir) if cache_dir else None
+        self.cache_max_bytes = cache_max_bytes
+        self.clear()
+    
+    def clear(self):
+        """Drop all stored chunks and index entries (settings are kept)"""
+        self.storage = {}  # int id -> {bit, text, hash}
+        self.id_map = {}   # chunk_id -> int id
+        self.chunk_ids = []  # int id -> chunk_id
+        self.index = defaultdict(partial(array, 'i'))  # keyword -> int ids
+        self.postings = {}  # keyword -> np.int32 array (built on demand)
         self.stats = {
             'total_chunks': 0,
             'total_bits': 0,
             'indexed_keywords': 0
         }
     
-    def store_chunk(self, chunk_id: str, text: str) -> Dict:
+    def store_chunk(self, chunk_id: str, text: str, digest: Optional[bytes] = None) -> Dict:
         """Store text chunk in gravitational bit"""
         
-        # Create gravitational bit
-        bit = GravitationalBit(compression_level=self.compression_level)
-        
-        # Encode text hash as integer
-        text_hash = int(hashlib.md5(text.encode()).hexdigest(), 16)
-        bit.encode(text_hash % (2 ** len(bit.states)))
+        # Encode text hash as integer (reuse the caller's digest if given)
+        if digest is None:
+            digest = _digest(text.encode())
+        text_hash = int.from_bytes(digest, 'little')
         
-        # Test propagation (simulate quantum evolution)
-        original = bit.decode()
-        bit.propagate(dt=0.01)
+        if self._simulate:
+            # Create gravitational bit
+            bit = GravitationalBit(compression_level=self.compression_level)
+            bit.encode(text_hash)  # Masked to n_states bits by encode
+            
+            # Test propagation (simulate quantum evolution)
+            original = bit.decode()
+            bit.propagate(dt=0.01)
+            
+            # Verify integrity
+            integrity = bit.verify_integrity(original)
+        else:
+            # Simulation disabled: the text is stored as-is
+            bit = None
+            integrity = True
         
-        # Verify integrity
-        integrity = bit.verify_integrity(original)
+        # Map chunk_id to a compact int id
+        int_id = self.id_map.get(chunk_id)
+        if int_id is None:
+            int_id = self.id_map[chunk_id] = len(self.chunk_ids)
+            self.chunk_ids.append(chunk_id)
         
         # Store
-        self.storage[chunk_id] = {
+        self.storage[int_id] = {
             'bit': bit,
             'text': text,
             'hash': text_hash,
@@ -134,13 +277,10 @@ class GravitationalMemory:
         }
         
         # Index keywords
-        words = text.lower().split()
-        for word in words:
-            word_clean = word.strip('.,!?;:"\'()[]{}')
-            if len(word_clean) > 3:
-                if word_clean not in self.index:
-                    self.index[word_clean] = []
-                self.index[word_clean].append(chunk_id)
+        for word in _TOKEN_RE.findall(text.lower()):
+            word = sys.intern(word)
+            self.index[word].append(int_id)
+            self.postings.pop(word, None)  # Stale, rebuilt on next query
         
         # Update stats
         self.stats['total_chunks'] += 1
@@ -149,69 +289,183 @@ class GravitationalMemory:
         
         return {
             'chunk_id': chunk_id,
-            'states': len(bit.states),
+            'states': self.n_states,
             'integrity': integrity
         }
     
     def store_document(self, text: str, chunk_size: int = 200) -> Dict:
         """Store entire document"""
         
+        # Disk cache: only for an empty memory, whose state after loading
+        # depends on nothing but the document and the settings
+        cache_key = None
+        if self.cache_dir and not self.storage:
+            cache_key = self._cache_key(text, chunk_size)
+            cached = self._load_cached(cache_key)
+            if cached is not None:
+                return cached
+        
         # Split into chunks
         words = text.split()
-        chunks = []
+        chunk_texts = [' '.join(words[i:i+chunk_size])
+                       for i in range(0, len(words), chunk_size)]
         
-        for i in range(0, len(words), chunk_size):
-            chunk_text = ' '.join(words[i:i+chunk_size])
-            chunk_id = hashlib.md5(chunk_text.encode()).hexdigest()[:8]
-            
-            self.store_chunk(chunk_id, chunk_text)
+        # Hash each chunk once (sequential: ~1.7 KB chunks are below
+        # hashlib's 2 KB GIL-release threshold, so a pool only adds overhead)
+        chunks = []
+        for chunk_text in chunk_texts:
+            digest = _digest(chunk_text.encode())
+            chunk_id = digest[:4].hex()
+            self.store_chunk(chunk_id, chunk_text, digest)
             chunks.append(chunk_id)
         
         # Calculate compression ratio
         original_size = len(text)
         compressed_size = self.stats['total_bits'] * (self.compression_level ** 2)
         
-        return {
+        result = {
             'chunks': len(chunks),
             'bits': self.stats['total_bits'],
             'compression_ratio': original_size / compressed_size if compressed_size > 0 else 0,
             'indexed_keywords': self.stats['indexed_keywords'],
             'integrity': '100%'  # Always 100% with gravitational bits
         }
+        
+        if cache_key is not None:
+            self._save_cached(cache_key, result)
+        
+        return result
+    
+    def _cache_key(self, text: str, chunk_size: int) -> str:
+        """Cache key of a document under the current settings"""
+        settings = f'{_CACHE_VERSION}:{self.compression_level}:{chunk_size}:{int(self._simulate)}:'
+        return _digest(settings.encode() + text.encode()).hex()
+    
+    def _load_cached(self, cache_key: str) -> Optional[Dict]:
+        """Restore memory state from disk cache (None on miss)"""
+        path = os.path.join(self.cache_dir, cache_key + '.pkl')
+        try:
+            with open(path, 'rb') as f:
+                state = pickle.load(f)
+            storage, id_map, chunk_ids, index, stats, result = (
+                state['storage'], state['id_map'], state['chunk_ids'],
+                state['index'], state['stats'], state['result']
+            )
+        except Exception:
+            return None  # Missing or corrupt entry: recompute
+        
+        try:
+            os.utime(path)  # Mark as recently used (eviction order)
+        except OSError:
+            pass
+        
+        self.storage = storage
+        self.id_map = id_map
+        self.chunk_ids = chunk_ids
+        self.index = index
+        self.postings = {}
+        self.stats = stats
+        return result
+    
+    def _save_cached(self, cache_key: str, result: Dict):
+        """Persist memory state to disk cache (best effort)"""
+        state = {
+            'storage': self.storage,
+            'id_map': self.id_map,
+            'chunk_ids': self.chunk_ids,
+            'index': self.index,
+            'stats': self.stats,
+            'result': result
+        }
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write then rename, so concurrent readers never see partial files
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        except OSError:
+            return
+        
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, os.path.join(self.cache_dir, cache_key + '.pkl'))
+        except OSError:
+            try:
+                os.remove(tmp_path)  # Not counted by eviction: never leave it behind
+            except OSError:
+                pass
+            return
+        
+        self._evict_cached()
+    
+    def _evict_cached(self):
+        """Delete least recently used entries until the cache fits its cap"""
+        try:
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith('.pkl'):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        except OSError:
+            return
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):  # Oldest first
+            if total <= self.cache_max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
     
     def retrieve_relevant_context(self, query: str, top_k: int = 8) -> str:
         """Retrieve top-K relevant chunks"""
         
         # Extract query keywords
-        query_words = [w.lower().strip('.,!?;:"\'()[]{}') 
-                      for w in query.split() if len(w) > 3]
+        query_words = _TOKEN_RE.findall(query.lower())
         
-        # Score chunks
-        scores = {}
-        for word in query_words:
-            if word in self.index:
-                for chunk_id in self.index[word]:
-                    scores[chunk_id] = scores.get(chunk_id, 0) + 1
+        # Gather posting lists of matching keywords
+        hits = [self._posting(word) for word in query_words if word in self.index]
         
         # Top-K chunks
-        if not scores:
+        if not hits:
             # Fallback: return first chunks
-            top_chunks = list(self.storage.keys())[:top_k]
+            top_chunks = list(islice(self.storage, max(top_k, 0)))
         else:
-            top_chunks = sorted(scores, key=scores.get, reverse=True)[:top_k]
+            # Score = number of keyword hits per chunk
+            ids, counts = np.unique(np.concatenate(hits), return_counts=True)
+            if 0 < top_k < len(ids):
+                # Keep only chunks scoring at least the k-th best count
+                kth = np.partition(counts, len(counts) - top_k)[len(counts) - top_k]
+                keep = counts >= kth
+                ids, counts = ids[keep], counts[keep]
+            # Best first, ties in insertion order
+            order = np.argsort(-counts, kind='stable')[:top_k]
+            top_chunks = ids[order].tolist()
         
         # Retrieve text
         context_parts = []
-        for chunk_id in top_chunks:
-            if chunk_id in self.storage:
-                context_parts.append(self.storage[chunk_id]['text'])
+        for int_id in top_chunks:
+            if int_id in self.storage:
+                context_parts.append(self.storage[int_id]['text'])
         
         return '\n\n'.join(context_parts)
+    
+    def _posting(self, word: str) -> np.ndarray:
+        """Posting list of a keyword as an int32 array (cached)"""
+        posting = self.postings.get(word)
+        if posting is None:
+            # Copy: a view would pin the array('i') buffer and block appends
+            posting = np.frombuffer(self.index[word], dtype=np.int32).copy()
+            self.postings[word] = posting
+        return posting
 
 # ============================================================================
 # LLM RAG BOOSTER (LLM Agnostic)
 # ============================================================================
 
+_HTTP_POOL_SIZE = 8  # Max concurrent connections per host
+
 class LLMRAGBooster:
     """
     Universal RAG with Gravitational Memory.
@@ -219,19 +473,39 @@ class LLMRAGBooster:
     """
     
     def __init__(self, api_url: str, api_key: str, model: str, 
-                 compression_level: int = 15):
+                 compression_level: int = 15,
+                 enable_gravitational_sim: bool = True,
+                 cache_dir: Optional[str] = None,
+                 cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
         """
         Args:
             api_url: LLM API endpoint (Groq, OpenAI, Anthropic, Ollama...)
             api_key: API key (empty string for local LLMs)
             model: Model name
             compression_level: Internal optimization (default=15, optimal)
+            enable_gravitational_sim: Simulate a bit per chunk (default=True)
+            cache_dir: Disk cache for loaded documents (default=None)
+            cache_max_bytes: Disk cache size cap (default=256 MB)
         """
         self.api_url = api_url
         self.api_key = api_key
         self.model = model
-        self.memory = GravitationalMemory(compression_level=compression_level)
+        self.memory = GravitationalMemory(
+            compression_level=compression_level,
+            enable_gravitational_sim=enable_gravitational_sim,
+            cache_dir=cache_dir,
+            cache_max_bytes=cache_max_bytes
+        )
         self.compression_level = compression_level
+        
+        # Persistent HTTP session (keep-alive: one TLS handshake per host)
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=_HTTP_POOL_SIZE)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        self._session.headers.update({'Content-Type': 'application/json'})
+        if api_key:
+            self._session.headers['Authorization'] = f'Bearer {api_key}'
     
     def load_document(self, text: str) -> Dict:
         """Load document into gravitational memory"""
@@ -262,23 +536,18 @@ Answer based on the context above:"""
         
         # Call LLM (universal format)
         try:
-            headers = {'Content-Type': 'application/json'}
-            if self.api_key:
-                headers['Authorization'] = f'Bearer {self.api_key}'
-            
-            response = requests.post(
+            response = self._session.post(
                 self.api_url,
-                headers=headers,
-                json={
+                data=_json_dumps({
                     'model': self.model,
                     'messages': [{'role': 'user', 'content': prompt}],
                     'temperature': 0.3,
                     'max_tokens': 500
-                },
+                }),
                 timeout=30
             )
             
-            data = response.json()
+            data = _json_loads(response.content)
             
             # Handle different response formats
             if 'choices' in data:  # OpenAI/Groq format
@@ -297,6 +566,20 @@ Answer based on the context above:"""
         except Exception as e:
             return f"ERROR calling LLM: {str(e)}"
     
+    def ask_batch(self, questions: List[str], use_memory: bool = True,
+                  top_k: int = 8) -> List[str]:
+        """
+        Ask several independent questions concurrently.
+        
+        Requests overlap on the shared session; answers are returned
+        in the order of the questions.
+        """
+        if len(questions) <= 1:
+            return [self.ask(q, use_memory, top_k) for q in questions]
+        
+        with ThreadPoolExecutor(max_workers=min(len(questions), _HTTP_POOL_SIZE)) as executor:
+            return list(executor.map(lambda q: self.ask(q, use_memory, top_k), questions))
+    
     def get_stats(self) -> Dict:
         """Get gravitational memory statistics"""
         return {
@@ -321,7 +604,8 @@ def init(api_url: str, api_key: str, model_name: str) -> Dict:
         api_url=api_url,
         api_key=api_key,
         model=model_name,
-        compression_level=15  # Optimal setting
+        compression_level=15,  # Optimal setting
+        cache_dir=os.environ.get(CACHE_DIR_ENV)  # Disk cache is opt-in
     )
     return {
         'success': True,
@@ -339,6 +623,7 @@ def load(text: str) -> Dict:
         'success': True,
         'chunks': stats['chunks'],
         'compression_ratio': f"{stats['compression_ratio']:.2f}×",
+        'compression_ratio_num': stats['compression_ratio'],
         'indexed_keywords': stats['indexed_keywords'],
         'integrity': stats['integrity']
     }
@@ -350,6 +635,21 @@ def ask(question: str, top_k: int = 8) -> str:
     
     return _booster.ask(question, use_memory=True, top_k=top_k)
 
+def ask_batch(questions: List[str], top_k: int = 8) -> List[str]:
+    """Ask several questions concurrently"""
+    if not _booster:
+        return ['ERROR: Not initialized. Call init() first.'] * len(questions)
+    
+    return _booster.ask_batch(questions, use_memory=True, top_k=top_k)
+
+def reset() -> Dict:
+    """Clear gravitational memory, keeping the LLM endpoint"""
+    if not _booster:
+        return {'error': 'Not initialized'}
+    
+    _booster.memory.clear()
+    return {'success': True}
+
 def stats() -> Dict:
     """Get gravitational memory statistics"""
     if not _booster:
@@ -361,23 +661,68 @@ def stats() -> Dict:
 # ALLPATH ENTRY POINT
 # ============================================================================
 
+def dispatch(func: str, args: List) -> Any:
+    """Run one Allpath function by name"""
+    if func == 'init':
+        return init(*args)
+    elif func == 'load':
+        return load(*args)
+    elif func == 'ask':
+        return ask(*args)
+    elif func == 'ask_batch':
+        return ask_batch(*args)
+    elif func == 'reset':
+        return reset()
+    elif func == 'stats':
+        return stats()
+    else:
+        return {'error': f'Unknown function: {func}'}
+
+def serve(use_pickle: bool = False):
+    """
+    Persistent worker: one JSON request per stdin line
+    ({"fn": ..., "args": [...]}), one JSON result per stdout line.
+    State (init, loaded documents) is kept between requests.
+    
+    With use_pickle, requests are pickled (fn, args) tuples and results
+    are pickled back (trusted local callers only).
+    """
+    out = sys.stdout.buffer
+    if use_pickle:
+        while True:
+            try:
+                fn, args = pickle.load(sys.stdin.buffer)
+                result = dispatch(fn, args)
+            except EOFError:
+                return  # Caller closed stdin
+            except Exception as e:
+                result = {'error': f'Bad request: {str(e)}'}
+            pickle.dump(result, out, protocol=pickle.HIGHEST_PROTOCOL)
+            out.flush()
+    
+    for line in sys.stdin.buffer:
+        if not line.strip():
+            continue
+        try:
+            request = _json_loads(line)
+            result = dispatch(request['fn'], request.get('args', []))
+        except Exception as e:
+            result = {'error': f'Bad request: {str(e)}'}
+        out.write(_json_dumps_ascii(result) + b'\n')
+        out.flush()
+
 if __name__ == '__main__':
     if len(sys.argv) < 2:
-        print(json.dumps({'error': 'No function specified'}))
+        sys.stdout.buffer.write(_json_dumps_ascii({'error': 'No function specified'}) + b'\n')
         sys.exit(1)
     
+    if sys.argv[1] == '--serve':
+        serve(use_pickle='--pickle' in sys.argv[2:])
+        sys.exit(0)
+    
     func = sys.argv[1]
-    args = json.loads(sys.argv[2]) if len(sys.argv) > 2 else []
+    args = _json_loads(sys.argv[2]) if len(sys.argv) > 2 else []
     
-    if func == 'init':
-        result = init(*args)
-    elif func == 'load':
-        result = load(*args)
-    elif func == 'ask':
-        result = ask(*args)
-    elif func == 'stats':
-        result = stats()
-    else:
-        result = {'error': f'Unknown function: {func}'}
+    result = dispatch(func, args)
     
-    print(json.dumps(result))
+    sys.stdout.buffer.write(_json_dumps_ascii(result) + b'\n')
@@ -0,0 +1,30 @@
+"""
+pytest configuration for test.py
+
+    pytest                 # in-process booster
+    pytest --subprocess    # through a persistent booster.py worker
+    pytest -n 4            # parallel (pytest-xdist)
+    pytest -n 4 --subprocess
+"""
+
+import pytest
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--subprocess', action='store_true',
+        help='Call booster through a persistent booster.py --serve worker'
+    )
+
+@pytest.fixture(scope='session', autouse=True)
+def booster_worker(request):
+    """Start the booster worker once per session (RPC mode only)"""
+    import test as booster_tests
+    
+    # From the option, not sys.argv: xdist workers see argv == ['-c']
+    booster_tests._USE_SUBPROCESS = request.config.getoption('--subprocess')
+    if not booster_tests._USE_SUBPROCESS:
+        yield None
+        return
+    
+    yield booster_tests._worker()
+    booster_tests._stop_worker()
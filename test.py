@@ -4,56 +4,143 @@ Performance Tests - LLM RAG Booster
 Validates compression, integrity, and retrieval accuracy
 """
 
-import json
+import atexit
+import os
+import pickle
 import subprocess
+import sys
+import tempfile
+import threading
 import time
+import timeit
+
+import booster as _booster
+
+# Timings must measure real loads: keep the opt-in disk cache off
+# (also for the worker process, which inherits the environment)
+os.environ.pop(_booster.CACHE_DIR_ENV, None)
+
+# Output banners
+_BAR = "=" * 70
+_ROCKETS = "🚀" * 35
+_PARTY = "🎉" * 35
+
+# Allpath functions, called in-process (no interpreter start per call)
+_DISPATCH = {
+    'init': _booster.init,
+    'load': _booster.load,
+    'ask': _booster.ask,
+    'ask_batch': _booster.ask_batch,
+    'reset': _booster.reset,
+    'stats': _booster.stats
+}
+
+# RPC mode: calls go to one persistent `booster.py --serve --pickle` process
+# (set by `python test.py --subprocess` or conftest.py's --subprocess option)
+_USE_SUBPROCESS = False
+_WORKER = None
+
+def _worker():
+    """Start the booster worker on first use"""
+    global _WORKER
+    if _WORKER is None:
+        _WORKER = subprocess.Popen(
+            ['python3', 'booster.py', '--serve', '--pickle'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE
+        )
+        atexit.register(_stop_worker)
+    return _WORKER
+
+def _stop_worker():
+    """Close the worker's stdin and wait for it to exit"""
+    global _WORKER
+    if _WORKER is not None:
+        _WORKER.stdin.close()
+        _WORKER.wait(timeout=10)
+        _WORKER = None
 
 def call_booster(function, args):
     """Simulate Allpath call to booster"""
-    result = subprocess.run(
-        ['python3', 'booster.py', function, json.dumps(args)],
-        capture_output=True,
-        text=True
-    )
-    return json.loads(result.stdout)
+    if not _USE_SUBPROCESS:
+        return _DISPATCH[function](*args)
+    
+    worker = _worker()
+    pickle.dump((function, args), worker.stdin, protocol=pickle.HIGHEST_PROTOCOL)
+    worker.stdin.flush()
+    return pickle.load(worker.stdout)
+
+_INIT_RESULT = None
+
+def _ensure_init():
+    """Initialize the booster once, then only clear its memory per test"""
+    global _INIT_RESULT
+    if _INIT_RESULT is None:
+        _INIT_RESULT = call_booster('init', [
+            'http://localhost:11434/api/chat',  # Mock endpoint
+            '',
+            'test-model'
+        ])
+    else:
+        call_booster('reset', [])
+    return _INIT_RESULT
+
+def call_booster_many(function, args_list):
+    """
+    Call one function for each args, results in order.
+    In RPC mode all requests are pipelined before reading the replies.
+    """
+    if not _USE_SUBPROCESS:
+        return [call_booster(function, args) for args in args_list]
+    
+    worker = _worker()
+    
+    def send():
+        for args in args_list:
+            pickle.dump((function, args), worker.stdin, protocol=pickle.HIGHEST_PROTOCOL)
+        worker.stdin.flush()
+    
+    # Write from a thread so large batches cannot fill both pipes
+    sender = threading.Thread(target=send)
+    sender.start()
+    results = [pickle.load(worker.stdout) for _ in args_list]
+    sender.join()
+    return results
+
+# Test 1 document: a fixed paragraph repeated
+BASE_TEXT = """
+    Artificial Intelligence represents a fundamental transformation in computing.
+    Machine learning algorithms enable systems to learn patterns from data.
+    Deep neural networks with multiple layers process complex information.
+    Natural Language Processing allows computers to understand human communication.
+    Computer Vision systems interpret and analyze visual information.
+    Reinforcement Learning trains agents through environmental interaction.
+    """
+BASE_WORDS = len(BASE_TEXT.split())
 
 def test_compression_performance():
     """Test 1: Compression ratio validation"""
     
-    print("="*70)
+    print(_BAR)
     print("TEST 1: COMPRESSION PERFORMANCE")
-    print("="*70)
+    print(_BAR)
     
     # Initialize
     print("\n📡 Initializing (mock API)...")
-    result = call_booster('init', [
-        'http://localhost:11434/api/chat',  # Mock endpoint
-        '',
-        'test-model'
-    ])
+    result = _ensure_init()
     print(f"✅ Init: {result}")
     print(f"   Compression states: {result['compression_states']}")
     
     # Load large document
     print("\n📄 Loading test document (5000 words)...")
     
-    # Generate large text
-    base_text = """
-    Artificial Intelligence represents a fundamental transformation in computing.
-    Machine learning algorithms enable systems to learn patterns from data.
-    Deep neural networks with multiple layers process complex information.
-    Natural Language Processing allows computers to understand human communication.
-    Computer Vision systems interpret and analyze visual information.
-    Reinforcement Learning trains agents through environmental interaction.
-    """
-    
     # Repeat to create large document
-    large_doc = (base_text * 100).strip()  # ~5000 words
-    word_count = len(large_doc.split())
+    large_doc = BASE_TEXT * 100  # ~5000 words
+    word_count = BASE_WORDS * 100
     
-    start_time = time.time()
+    start_time = time.perf_counter()
     stats = call_booster('load', [large_doc])
-    load_time = time.time() - start_time
+    load_time = time.perf_counter() - start_time
     
     print(f"\n✅ Loaded in {load_time:.3f}s")
     print(f"   Words: {word_count}")
@@ -63,24 +150,23 @@ def test_compression_performance():
     print(f"   Integrity: {stats['integrity']}")
     
     # Validate compression
-    compression_value = float(stats['compression_ratio'].replace('×', ''))
+    compression_value = stats['compression_ratio_num']
     assert compression_value > 10, "❌ Compression should be >10×"
     print(f"\n✅ PASS: Compression {compression_value}× (target: >10×)")
-    
-    return stats
 
-def test_retrieval_accuracy():
-    """Test 2: Retrieval accuracy"""
-    
-    print("\n" + "="*70)
-    print("TEST 2: RETRIEVAL ACCURACY")
-    print("="*70)
-    
-    # Initialize
-    call_booster('init', ['http://localhost:11434/api/chat', '', 'test-model'])
-    
-    # Load document with specific facts
-    doc = """
+# Test 2 queries, expected keywords lowercased once for answer matching
+TEST_QUERIES = tuple(
+    (query, tuple(k.lower() for k in keywords))
+    for query, keywords in [
+        ("Who created Python?", ["Guido", "van Rossum", "1991"]),
+        ("What frameworks are mentioned?", ["Django", "Flask", "FastAPI"]),
+        ("When did Python 2 end?", ["2020", "end-of-life"]),
+        ("Python features?", ["dynamic", "typing", "garbage"])
+    ]
+)
+
+# Test 2 document with specific facts
+RETRIEVAL_DOC = """
     The Python programming language was created by Guido van Rossum in 1991.
     Python emphasizes code readability with significant whitespace indentation.
     
@@ -105,27 +191,29 @@ def test_retrieval_accuracy():
     Popular Python frameworks include Django for web development,
     Flask for microservices, and FastAPI for modern APIs.
     """
+
+def test_retrieval_accuracy():
+    """Test 2: Retrieval accuracy"""
+    
+    print("\n" + _BAR)
+    print("TEST 2: RETRIEVAL ACCURACY")
+    print(_BAR)
+    
+    # Initialize
+    _ensure_init()
     
     print("\n📄 Loading document with structured facts...")
-    stats = call_booster('load', [doc])
+    stats = call_booster('load', [RETRIEVAL_DOC])
     print(f"✅ {stats['chunks']} chunks indexed")
     
     # Test retrieval with different queries
     print("\n🔍 Testing keyword retrieval...")
     
-    test_queries = [
-        ("Who created Python?", ["Guido", "van Rossum", "1991"]),
-        ("What frameworks are mentioned?", ["Django", "Flask", "FastAPI"]),
-        ("When did Python 2 end?", ["2020", "end-of-life"]),
-        ("Python features?", ["dynamic", "typing", "garbage"])
-    ]
-    
     passed = 0
-    for query, expected_keywords in test_queries:
+    for query, expected_keywords in TEST_QUERIES:
         # Mock retrieval (we can't call real LLM in test)
         # Instead, test that keywords are in indexed memory
         
-        query_words = query.lower().split()
         stats_result = call_booster('stats', [])
         
         print(f"\n   Q: {query}")
@@ -140,79 +228,74 @@ def test_retrieval_accuracy():
         else:
             print(f"   ⚠️  Marginal (low indexing)")
     
-    print(f"\n✅ RETRIEVAL TEST: {passed}/{len(test_queries)} passed")
-    return passed == len(test_queries)
+    print(f"\n✅ RETRIEVAL TEST: {passed}/{len(TEST_QUERIES)} passed")
+    assert passed == len(TEST_QUERIES), "❌ Not all queries have sufficient indexing"
+
+# Test 3 documents
+INTEGRITY_DOCS = (
+    "Document 1: Machine learning fundamentals and algorithms.",
+    "Document 2: Deep learning neural network architectures.",
+    "Document 3: Natural language processing techniques.",
+    "Document 4: Computer vision image recognition methods.",
+    "Document 5: Reinforcement learning reward systems.",
+    "Document 6: Supervised learning classification tasks.",
+    "Document 7: Unsupervised learning clustering algorithms.",
+    "Document 8: Transfer learning pre-trained models.",
+    "Document 9: Ensemble methods boosting and bagging.",
+    "Document 10: Hyperparameter optimization strategies."
+)
 
 def test_integrity_guarantee():
     """Test 3: 100% integrity guarantee"""
     
-    print("\n" + "="*70)
+    print("\n" + _BAR)
     print("TEST 3: INTEGRITY GUARANTEE")
-    print("="*70)
+    print(_BAR)
     
     # Initialize
-    call_booster('init', ['http://localhost:11434/api/chat', '', 'test-model'])
+    _ensure_init()
     
     # Load multiple documents
     print("\n📄 Loading 10 documents...")
     
-    docs = [
-        "Document 1: Machine learning fundamentals and algorithms.",
-        "Document 2: Deep learning neural network architectures.",
-        "Document 3: Natural language processing techniques.",
-        "Document 4: Computer vision image recognition methods.",
-        "Document 5: Reinforcement learning reward systems.",
-        "Document 6: Supervised learning classification tasks.",
-        "Document 7: Unsupervised learning clustering algorithms.",
-        "Document 8: Transfer learning pre-trained models.",
-        "Document 9: Ensemble methods boosting and bagging.",
-        "Document 10: Hyperparameter optimization strategies."
-    ]
-    
-    all_integrity = []
-    for i, doc in enumerate(docs, 1):
-        stats = call_booster('load', [doc])
-        all_integrity.append(stats['integrity'])
+    perfect_count = 0
+    for i, stats in enumerate(call_booster_many('load', [[doc] for doc in INTEGRITY_DOCS]), 1):
+        if stats['integrity'] == '100%':
+            perfect_count += 1
         print(f"   Doc {i}: {stats['integrity']} integrity")
     
     # Verify all 100%
-    perfect_count = sum(1 for i in all_integrity if i == '100%')
-    
-    print(f"\n✅ INTEGRITY: {perfect_count}/{len(docs)} at 100%")
-    assert perfect_count == len(docs), "❌ Not all documents at 100% integrity"
+    print(f"\n✅ INTEGRITY: {perfect_count}/{len(INTEGRITY_DOCS)} at 100%")
+    assert perfect_count == len(INTEGRITY_DOCS), "❌ Not all documents at 100% integrity"
     
     print(f"✅ PASS: All documents maintain perfect integrity")
-    return True
 
 def test_performance_vs_baseline():
     """Test 4: Performance comparison"""
     
-    print("\n" + "="*70)
+    print("\n" + _BAR)
     print("TEST 4: PERFORMANCE vs BASELINE")
-    print("="*70)
+    print(_BAR)
     
     # Baseline (simple dict storage)
     print("\n⚖️  Comparing vs simple dict storage...")
     
     test_text = "AI " * 1000  # 1000 words
     
-    # Baseline
-    import time
-    start = time.time()
-    baseline_storage = {'text': test_text}
-    baseline_time = time.time() - start
+    # Baseline (averaged: a single dict store is below timer resolution)
+    baseline_time = timeit.timeit(lambda: {'text': test_text}, number=100000) / 100000
     baseline_size = len(test_text)
     
     # Gravitational
-    call_booster('init', ['http://localhost:11434/api/chat', '', 'test'])
+    _ensure_init()
     
-    start = time.time()
+    start = time.perf_counter()
     stats = call_booster('load', [test_text])
-    grav_time = time.time() - start
-    grav_size = baseline_size / float(stats['compression_ratio'].replace('×', ''))
+    grav_time = time.perf_counter() - start
+    grav_size = baseline_size / stats['compression_ratio_num']
     
     print(f"\n   Baseline:")
-    print(f"      Time: {baseline_time*1000:.2f}ms")
+    print(f"      Time: {baseline_time*1e6:.3f}µs")
     print(f"      Size: {baseline_size} bytes")
     
     print(f"\n   Gravitational:")
@@ -225,61 +308,206 @@ def test_performance_vs_baseline():
     
     assert space_saving > 50, "❌ Compression should save >50% space"
     print(f"✅ PASS: Significant space savings achieved")
+
+def test_disk_cache():
+    """Test 5: Disk cache hit, miss, corrupt entry and eviction"""
+    
+    print("\n" + _BAR)
+    print("TEST 5: DISK CACHE")
+    print(_BAR)
     
-    return True
+    with tempfile.TemporaryDirectory() as cache_dir:
+        def entries():
+            return [os.path.join(cache_dir, name) for name in os.listdir(cache_dir)
+                    if name.endswith('.pkl')]
+        
+        def first_phase(memory):
+            return memory.storage[0]['bit'].phase
+        
+        # Miss: computed, then written to the cache
+        first = _booster.GravitationalMemory(cache_dir=cache_dir)
+        result = first.store_document(RETRIEVAL_DOC)
+        assert len(entries()) == 1, "❌ Miss should write one cache entry"
+        print("\n✅ Miss: document stored and cached")
+        
+        # Hit: state restored as saved (random phases are not redrawn)
+        hit = _booster.GravitationalMemory(cache_dir=cache_dir)
+        assert hit.store_document(RETRIEVAL_DOC) == result, "❌ Hit should return the cached result"
+        assert (first_phase(hit) == first_phase(first)).all(), "❌ Hit should restore the cached state"
+        assert hit.retrieve_relevant_context("Who created Python?") == \
+            first.retrieve_relevant_context("Who created Python?"), "❌ Hit should restore the index"
+        print("✅ Hit: cached state restored")
+        
+        # Corrupt entry: recomputed and rewritten
+        path, = entries()
+        with open(path, 'wb') as f:
+            f.write(b'not a pickle')
+        recovered = _booster.GravitationalMemory(cache_dir=cache_dir)
+        assert recovered.store_document(RETRIEVAL_DOC) == result, "❌ Corrupt entry should be recomputed"
+        assert not (first_phase(recovered) == first_phase(first)).all(), "❌ Corrupt entry should not be used"
+        with open(path, 'rb') as f:
+            pickle.load(f)
+        print("✅ Corrupt entry: recomputed and rewritten")
+        
+        # Eviction: a cap below two entries keeps only the most recent one
+        os.utime(path, (0, 0))
+        capped = _booster.GravitationalMemory(cache_dir=cache_dir,
+                                              cache_max_bytes=os.path.getsize(path) * 3 // 2)
+        capped.store_document(BASE_TEXT)
+        assert len(entries()) == 1 and path not in entries(), "❌ Oldest entry should be evicted"
+        print("✅ Eviction: least recently used entry removed")
+        
+        # Failed write: a directory in the way of the entry, no temp file left
+        blocked = _booster.GravitationalMemory(cache_dir=cache_dir)
+        os.mkdir(os.path.join(cache_dir, blocked._cache_key(BASE_TEXT, 100) + '.pkl'))
+        blocked.store_document(BASE_TEXT, chunk_size=100)
+        assert not [name for name in os.listdir(cache_dir) if name.endswith('.tmp')], \
+            "❌ Failed write should remove its temp file"
+        print("✅ Failed write: temp file removed")
+    
+    print(f"✅ PASS: Disk cache behaves correctly")
+
+# Test 6 values: zero, small, negative, wider than 1240 bits, all ones
+ROUND_TRIP_VALUES = (0, 1, 0b1011, -1, -12345, 2**1240 + 5, 2**2000 - 1)
+
+def test_bit_round_trip():
+    """Test 6: encode/decode round trip of GravitationalBit"""
+    
+    print("\n" + _BAR)
+    print("TEST 6: BIT ROUND TRIP")
+    print(_BAR)
+    
+    # Level 10 has 385 states (not a whole number of bytes)
+    for level in (15, 10, 1):
+        bit = _booster.GravitationalBit(compression_level=level)
+        mask = (1 << bit.n_states) - 1
+        for value in ROUND_TRIP_VALUES:
+            bit.encode(value)
+            assert bit.decode() == value & mask, \
+                f"❌ Level {level}: decode(encode({value})) should keep the low {bit.n_states} bits"
+        print(f"\n✅ Level {level}: {len(ROUND_TRIP_VALUES)} values round-trip over {bit.n_states} states")
+    
+    print(f"✅ PASS: Encode/decode is lossless")
+
+# Test 7 chunks: scores for "alpha beta" are 2, 1, 3, 0
+RANKING_CHUNKS = ("alpha beta", "gamma alpha", "alpha beta gamma beta", "delta")
+
+def _reference_ranking(chunks, query, top_k):
+    """Expected retrieval: most keyword hits first, ties in insertion order"""
+    words = _booster._TOKEN_RE.findall(query.lower())
+    scores = [sum(tokens.count(w) for w in words)
+              for tokens in (_booster._TOKEN_RE.findall(c.lower()) for c in chunks)]
+    ranked = sorted((i for i, score in enumerate(scores) if score), key=lambda i: -scores[i])
+    return [chunks[i] for i in ranked[:top_k]] if ranked else list(chunks[:top_k])
+
+def test_retrieval_ranking():
+    """Test 7: Retrieval ranking, top_k, ties and fallback"""
+    
+    print("\n" + _BAR)
+    print("TEST 7: RETRIEVAL RANKING")
+    print(_BAR)
+    
+    def retrieve(memory, query, top_k):
+        context = memory.retrieve_relevant_context(query, top_k)
+        return context.split('\n\n') if context else []
+    
+    # Hand-built chunks: every branch of the scoring path
+    memory = _booster.GravitationalMemory(enable_gravitational_sim=False)
+    for i, text in enumerate(RANKING_CHUNKS):
+        memory.store_chunk(f'c{i}', text)
+    c0, c1, c2, _ = RANKING_CHUNKS
+    
+    assert retrieve(memory, "alpha beta", 8) == [c2, c0, c1], "❌ Most keyword hits should come first"
+    assert retrieve(memory, "alpha beta", 1) == [c2], "❌ top_k=1 should keep only the best chunk"
+    assert retrieve(memory, "alpha beta", 2) == [c2, c0], "❌ top_k=2 should keep the two best chunks"
+    print("\n✅ Best chunk first, top_k respected")
+    
+    assert retrieve(memory, "alpha", 8) == [c0, c1, c2], "❌ Ties should keep insertion order"
+    assert retrieve(memory, "alpha", 2) == [c0, c1], "❌ Ties cut by top_k should keep insertion order"
+    print("✅ Ties in insertion order")
+    
+    assert retrieve(memory, "zeta", 2) == [c0, c1], "❌ No match should fall back to the first chunks"
+    assert retrieve(memory, "zeta", 0) == [], "❌ top_k=0 should return nothing"
+    print("✅ No-match fallback returns the first chunks")
+    
+    # Test 2 document in small chunks, queried with its expected keywords
+    memory = _booster.GravitationalMemory(enable_gravitational_sim=False)
+    memory.store_document(RETRIEVAL_DOC, chunk_size=12)
+    chunks = [entry['text'] for entry in memory.storage.values()]
+    assert len(chunks) > 3, "❌ Document should span several chunks"
+    
+    for query, expected_keywords in TEST_QUERIES:
+        keyword_query = ' '.join(expected_keywords)
+        for top_k in (1, 3, len(chunks)):
+            assert retrieve(memory, keyword_query, top_k) == \
+                _reference_ranking(chunks, keyword_query, top_k), \
+                f"❌ {query!r}: wrong top-{top_k} ranking"
+        best = retrieve(memory, keyword_query, 1)[0].lower()
+        assert any(k in best for k in expected_keywords), \
+            f"❌ {query!r}: best chunk should contain an expected keyword"
+        print(f"✅ {query}: best chunk matches {expected_keywords}")
+    
+    print(f"✅ PASS: Retrieval ranks chunks correctly")
 
 def run_all_tests():
     """Run complete test suite"""
     
-    print("\n" + "🚀"*35)
+    print("\n" + _ROCKETS)
     print("   LLM RAG BOOSTER - PERFORMANCE VALIDATION")
-    print("🚀"*35 + "\n")
+    print(_ROCKETS + "\n")
     
     results = {}
     
     try:
-        # Test 1
-        stats = test_compression_performance()
-        results['compression'] = 'PASS'
-        
-        # Test 2
-        results['retrieval'] = 'PASS' if test_retrieval_accuracy() else 'FAIL'
+        # Tests assert on failure (pytest-compatible): record FAIL and
+        # keep running the remaining tests
+        for name, test in (
+            ('compression', test_compression_performance),  # Test 1
+            ('retrieval', test_retrieval_accuracy),         # Test 2
+            ('integrity', test_integrity_guarantee),        # Test 3
+            ('performance', test_performance_vs_baseline),  # Test 4
+            ('disk_cache', test_disk_cache),                # Test 5
+            ('round_trip', test_bit_round_trip),            # Test 6
+            ('ranking', test_retrieval_ranking)             # Test 7
+        ):
+            try:
+                test()
+                results[name] = 'PASS'
+            except AssertionError as e:
+                print(f"\n❌ TEST FAILED: {e}")
+                results[name] = 'FAIL'
+            sys.stdout.flush()
         
-        # Test 3
-        results['integrity'] = 'PASS' if test_integrity_guarantee() else 'FAIL'
-        
-        # Test 4
-        results['performance'] = 'PASS' if test_performance_vs_baseline() else 'FAIL'
-        
-    except AssertionError as e:
-        print(f"\n❌ TEST FAILED: {e}")
-        return False
     except Exception as e:
         print(f"\n❌ ERROR: {e}")
         return False
     
     # Summary
-    print("\n" + "="*70)
+    print("\n" + _BAR)
     print("SUMMARY")
-    print("="*70)
+    print(_BAR)
     
+    all_pass = True
     for test, result in results.items():
-        icon = "✅" if result == "PASS" else "❌"
+        passed = result == "PASS"
+        icon = "✅" if passed else "❌"
         print(f"{icon} {test.upper()}: {result}")
-    
-    all_pass = all(r == 'PASS' for r in results.values())
+        all_pass = all_pass and passed
     
     if all_pass:
-        print("\n" + "🎉"*35)
+        print("\n" + _PARTY)
         print("   ALL TESTS PASSED - READY FOR PRODUCTION")
-        print("🎉"*35)
+        print(_PARTY)
     else:
         print("\n⚠️  SOME TESTS FAILED - REVIEW REQUIRED")
     
     return all_pass
 
 if __name__ == '__main__':
-    import sys
+    # Block-buffer output (even on a terminal); flushed once per test
+    sys.stdout.reconfigure(line_buffering=False)
+    
+    _USE_SUBPROCESS = '--subprocess' in sys.argv
     
     if '--quick' in sys.argv:
         # Quick test